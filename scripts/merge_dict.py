@@ -12,15 +12,18 @@ i18n-Dict-Merged: 合并用户贡献的翻译文件与上游 i18n-Dict-Extender
 import os
 import sqlite3
 import sys
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import orjson
 import requests
-import ujson as json
+from requests.adapters import HTTPAdapter
 
 # --- 配置常量 ---
-ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
-OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output"
+_ROOT = Path(__file__).resolve().parent.parent
+ASSETS_DIR = _ROOT / "assets"
+OUTPUT_DIR = _ROOT / "output"
 
 DB_FILENAME = "Dict-Sqlite.db"
 JSON_FILENAME = "Dict.json"
@@ -29,11 +32,48 @@ DIFF_JSON_FILENAME = "diff.json"
 RELEASE_BODY_FILENAME = "release_body.md"
 PATCHOULI_JSON_FILENAME = "patchouli_books.json"
 
+# 设置 PRETTY_JSON=1 时以缩进格式输出 Dict.json，默认输出紧凑格式
+PRETTY_JSON = os.getenv("PRETTY_JSON", "") not in ("", "0")
+
 UPSTREAM_REPO = "VM-Chinese-translate-group/i18n-Dict-Extender"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# 并行读取模组 JSON 的线程数，以及已读取但尚未写入数据库的模组数上限
+LOAD_WORKERS = 8
+LOAD_QUEUE_SIZE = 16
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 HEADERS = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
 
+# 复用同一个会话，使多次 GitHub 请求共享连接池与 TLS 连接
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+CREATE_UNIQUE_INDEX_SQL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS uniq_entry ON dict (MODID, KEY, VERSION, CURSEFORGE);"
+)
+# 所有模组共用同一条 SQL 文本，使 sqlite3 的语句缓存能复用已编译的语句
+UPSERT_SQL = (
+    "INSERT INTO dict (ORIGIN_NAME, TRANS_NAME, MODID, KEY, VERSION, CURSEFORGE) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (MODID, KEY, VERSION, CURSEFORGE) "
+    "DO UPDATE SET ORIGIN_NAME=excluded.ORIGIN_NAME, TRANS_NAME=excluded.TRANS_NAME"
+)
+# 上游数据存在重复条目、无法建立唯一索引时使用的回退语句：
+# 与 UPSERT_SQL 参数顺序相同，重复条目中仅更新最新（ID 最大）的一条
+UPDATE_SQL = (
+    "UPDATE dict SET ORIGIN_NAME=?, TRANS_NAME=? WHERE ID=("
+    "SELECT MAX(ID) FROM dict WHERE MODID=? AND KEY=? AND VERSION=? AND CURSEFORGE=?)"
+)
+INSERT_SQL = (
+    "INSERT INTO dict (ORIGIN_NAME, TRANS_NAME, MODID, KEY, VERSION, CURSEFORGE) VALUES (?, ?, ?, ?, ?, ?)"
+)
+SQLITE_CACHED_STATEMENTS = 256
+
+
+# 区分 "key 不存在" 与 "值为 null"
+_MISSING = object()
+
 
 # --- 步骤 1: 下载上游数据库 ---
 
@@ -42,12 +82,12 @@ def get_upstream_release_info():
     print(f"正在获取上游仓库 {UPSTREAM_REPO} 的最新 Release 信息...")
     release_url = f"https://api.github.com/repos/{UPSTREAM_REPO}/releases/latest"
 
-    response = requests.get(release_url, headers=HEADERS)
+    response = SESSION.get(release_url)
     if response.status_code != 200:
         print(f"警告：无法获取上游 Release (HTTP {response.status_code})。将创建新数据库。")
         return None, None
 
-    release_data = response.json()
+    release_data = orjson.loads(response.content)
     tag = release_data.get("tag_name", "")
     assets = release_data.get("assets", [])
     db_asset = next((a for a in assets if a["name"] == DB_FILENAME), None)
@@ -63,13 +103,12 @@ def download_upstream_db(db_asset, output_path):
 
     print(f"正在下载上游 {DB_FILENAME}...")
     download_url = db_asset["url"]
-    headers = HEADERS.copy()
-    headers["Accept"] = "application/octet-stream"
+    headers = {"Accept": "application/octet-stream"}
 
-    with requests.get(download_url, headers=headers, stream=True) as r:
+    with SESSION.get(download_url, headers=headers, stream=True) as r:
         r.raise_for_status()
         with open(output_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                 f.write(chunk)
 
     print(f"上游 {DB_FILENAME} 下载完成。")
@@ -78,8 +117,26 @@ def download_upstream_db(db_asset, output_path):
 
 # --- 步骤 2: 初始化数据库 ---
 
+def configure_connection(conn):
+    """为批量写入调整连接参数。"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-131072")
+
+
+def close_connection(conn):
+    """切回 DELETE 日志模式后关闭连接，使发布的 DB 为单文件且可只读打开。"""
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+
+
 def initialize_db(conn):
-    """初始化数据库表结构（与上游一致）。"""
+    """
+    初始化数据库表结构（与上游一致）。
+
+    返回: 是否成功建立 (MODID, KEY, VERSION, CURSEFORGE) 唯一索引（可否使用 upsert）
+    """
     print("正在初始化数据库表结构...")
     cursor = conn.cursor()
     cursor.execute("""
@@ -94,13 +151,30 @@ def initialize_db(conn):
     );
     """)
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_origin_name ON dict (ORIGIN_NAME);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_lookup ON dict (MODID, KEY, VERSION, CURSEFORGE);")
+    # uniq_entry 与上游的 idx_lookup 覆盖相同的列，只保留其中一个以免 DB 中存在两棵相同的 B 树
+    try:
+        cursor.execute(CREATE_UNIQUE_INDEX_SQL)
+        cursor.execute("DROP INDEX IF EXISTS idx_lookup;")
+        has_unique_index = True
+    except sqlite3.IntegrityError:
+        # 上游数据中存在重复条目：保留上游数据原样，合并时回退为逐条 UPDATE / INSERT
+        print("  警告：上游数据库存在重复条目，无法建立唯一索引，将使用 UPDATE/INSERT 合并。")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_lookup ON dict (MODID, KEY, VERSION, CURSEFORGE);")
+        has_unique_index = False
     conn.commit()
     print("数据库表结构就绪。")
+    return has_unique_index
 
 
 # --- 步骤 3: 扫描并合并本地翻译 ---
 
+def list_visible_subdirs(path):
+    """按名称排序列出 path 下的非隐藏子目录（os.scandir 会缓存文件类型，减少 stat 调用）。"""
+    with os.scandir(path) as it:
+        names = sorted(e.name for e in it if e.is_dir() and not e.name.startswith("."))
+    return [path / name for name in names]
+
+
 def scan_assets():
     """
     扫描 assets 目录，返回待处理的模组列表。
@@ -116,40 +190,48 @@ def scan_assets():
         print(f"警告：assets 目录不存在: {ASSETS_DIR}")
         return entries
 
-    for version_dir in sorted(ASSETS_DIR.iterdir()):
-        if not version_dir.is_dir() or version_dir.name.startswith("."):
-            continue
-
-        version = version_dir.name
+    for version_dir in list_visible_subdirs(ASSETS_DIR):
+        default_version = version_dir.name
 
-        for modid_dir in sorted(version_dir.iterdir()):
-            if not modid_dir.is_dir() or modid_dir.name.startswith("."):
-                continue
+        for modid_dir in list_visible_subdirs(version_dir):
+            # 一次 scandir 列出目录内容，之后只做集合查找，不再逐个 stat
+            with os.scandir(modid_dir) as it:
+                names = frozenset(e.name for e in it)
 
             en_path = modid_dir / "en_us.json"
             zh_path = modid_dir / "zh_cn.json"
             patchouli_path = modid_dir / "patchouli.json"
 
-            has_dict = en_path.exists() and zh_path.exists()
-            has_patchouli = patchouli_path.exists()
+            has_dict = "en_us.json" in names and "zh_cn.json" in names
+            has_patchouli = "patchouli.json" in names
 
             if not has_dict and not has_patchouli:
-                print(f"  跳过 {version}/{modid_dir.name}：既没有字典文件也没找到 patchouli.json")
+                print(f"  跳过 {default_version}/{modid_dir.name}：既没有字典文件也没找到 patchouli.json")
                 continue
 
-            # 默认值：从目录名推断
+            # 默认值：从目录名推断（每个模组单独取值，meta.json 的覆盖不会影响同版本下的其他模组）
+            version = default_version
             modid = modid_dir.name
             curseforge = modid.replace("_", "-")
 
-            # 可选 meta.json 覆盖
-            meta_path = modid_dir / "meta.json"
-            if meta_path.exists():
+            # 可选 meta.json 覆盖：大多数目录没有该文件，仅在名称集合中存在时才读取
+            if "meta.json" in names:
+                meta_path = modid_dir / "meta.json"
                 try:
-                    with open(meta_path, "r", encoding="utf-8") as f:
-                        meta = json.load(f)
-                    modid = meta.get("modid", modid)
-                    curseforge = meta.get("curseforge", curseforge)
-                    version = meta.get("version", version)
+                    meta = orjson.loads(meta_path.read_bytes())
+                    # 仅接受字符串覆盖值，其他类型会在分组预取时导致整个运行失败
+                    overrides = {}
+                    for field in ("modid", "curseforge", "version"):
+                        value = meta.get(field)
+                        if value is None:
+                            continue
+                        if isinstance(value, str):
+                            overrides[field] = value
+                        else:
+                            print(f"  警告：{meta_path} 中的 {field} 不是字符串，已忽略")
+                    modid = overrides.get("modid", modid)
+                    curseforge = overrides.get("curseforge", curseforge)
+                    version = overrides.get("version", version)
                 except Exception as e:
                     print(f"  警告：读取 {meta_path} 失败: {e}")
 
@@ -166,92 +248,152 @@ def scan_assets():
     return entries
 
 
-def merge_mod_entries(cursor, mod_info, global_patchouli: dict[str, str]):
+def load_existing_entries(cursor, groups):
     """
-    将单个模组的翻译条目合并到数据库中，并将 patchouli 条目合并至全局字典。
+    一次性读取本次涉及的 (modid, version, curseforge) 分组下已有条目的 key，
+    用于统计新增/更新数量，避免逐个模组查询，也不加载与本地翻译无关的上游条目。
 
-    返回: (insert_count, update_count, skipped_count, diff_entries)
+    返回: dict[(modid, version, curseforge)] -> set[key]
+    """
+    existing_all = defaultdict(set)
+    # 通过临时表与 dict 连接，只用一条查询即可取回所有分组，且不受 SQL 参数个数限制
+    cursor.execute("CREATE TEMP TABLE wanted_groups (MODID TEXT, VERSION TEXT, CURSEFORGE TEXT);")
+    cursor.executemany("INSERT INTO wanted_groups VALUES (?, ?, ?)", groups)
+    cursor.execute("""
+    SELECT d.MODID, d.VERSION, d.CURSEFORGE, d.KEY
+    FROM dict AS d
+    JOIN wanted_groups AS g
+        ON d.MODID = g.MODID AND d.VERSION = g.VERSION AND d.CURSEFORGE = g.CURSEFORGE;
+    """)
+    for modid, version, curseforge, key in cursor:
+        existing_all[(modid, version, curseforge)].add(key)
+    cursor.execute("DROP TABLE wanted_groups;")
+    return existing_all
+
+
+def load_mod_files(mod_info):
+    """
+    读取并解析单个模组的 JSON 文件（在工作线程中执行）。
+
+    返回: dict，包含 en_data, zh_data, patchouli_data（文件不存在时为空字典），
+    以及 dict_error：解析 en_us / zh_cn 失败时的异常。该异常推迟到 patchouli 合并之后
+    再抛出，使字典文件损坏时该模组的 patchouli 条目仍能被收录。
     """
     en_path = mod_info["en_path"]
     zh_path = mod_info["zh_path"]
     patchouli_path = mod_info["patchouli_path"]
+
+    mod_data = {
+        "en_data": {},
+        "zh_data": {},
+        "patchouli_data": orjson.loads(patchouli_path.read_bytes()) if patchouli_path else {},
+        "dict_error": None,
+    }
+    try:
+        if en_path:
+            mod_data["en_data"] = orjson.loads(en_path.read_bytes())
+        if zh_path:
+            mod_data["zh_data"] = orjson.loads(zh_path.read_bytes())
+    except Exception as e:
+        mod_data["dict_error"] = e
+    return mod_data
+
+
+def iter_loaded_mods(mod_entries):
+    """
+    使用线程池预读模组文件，按原顺序逐个产出 (mod_info, future)。
+
+    最多同时保留 LOAD_QUEUE_SIZE 个已提交的任务，以限制内存占用。
+    """
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+        pending = deque()
+        for mod_info in mod_entries:
+            pending.append((mod_info, executor.submit(load_mod_files, mod_info)))
+            if len(pending) >= LOAD_QUEUE_SIZE:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+
+def merge_mod_entries(
+    cursor, mod_info, mod_data, global_patchouli: dict[str, str], existing_keys: set[str], use_upsert: bool
+):
+    """
+    将单个模组的翻译条目合并到数据库中，并将 patchouli 条目合并至全局字典。
+
+    mod_data 为 load_mod_files() 的返回值。
+    existing_keys 为该模组 (modid, version, curseforge) 下已有条目的 key 集合，
+    写入成功后会加入本次新增的 key。
+    use_upsert 为 False 时（数据库没有唯一索引），改为分别执行 UPDATE 与 INSERT。
+
+    返回: (insert_count, update_count, skipped_count, diff_entries)
+    """
+    en_data = mod_data["en_data"]
+    zh_data = mod_data["zh_data"]
     modid = mod_info["modid"]
     version = mod_info["version"]
     curseforge = mod_info["curseforge"]
 
-    to_update = []
-    to_insert = []
     diff_entries = []
+    new_keys = []
+    updated = 0
     skipped = 0
     
     # --- 合并 Patchouli 书本翻译 ---
-    if patchouli_path:
-        with open(patchouli_path, "r", encoding="utf-8") as f:
-            patchouli_data = json.load(f)
-            # 全局 Patchouli 书本不再区分模组，使用原始的键直接合并
-            for k, v in patchouli_data.items():
-                if isinstance(v, str):
-                    global_patchouli[k] = v
+    # 全局 Patchouli 书本不再区分模组，使用原始的键直接合并
+    for k, v in mod_data["patchouli_data"].items():
+        if isinstance(v, str):
+            global_patchouli[k] = v
+
+    if mod_data["dict_error"] is not None:
+        raise mod_data["dict_error"]
                     
     # --- 合并 SQLite 字典 ---
-    common_keys = set()
-    if en_path and zh_path:
-        with open(en_path, "r", encoding="utf-8") as f:
-            en_data = json.load(f)
-        with open(zh_path, "r", encoding="utf-8") as f:
-            zh_data = json.load(f)
-
-        common_keys = en_data.keys() & zh_data.keys()
-
-    # 查询现有条目，构建 key -> ID 的映射
-    cursor.execute(
-        "SELECT KEY, ID FROM dict WHERE MODID=? AND VERSION=? AND CURSEFORGE=?",
-        (modid, version, curseforge),
-    )
-    existing_map = {row[0]: row[1] for row in cursor.fetchall()}
-
-    to_update = []
-    to_insert = []
-    diff_entries = []
-    skipped = 0
-
-    for key in common_keys:
-        origin = en_data[key]
-        trans = zh_data[key]
+    def iter_rows():
+        """逐条产出待 upsert 的行，由 executemany 直接消费，不再构建中间列表。"""
+        nonlocal updated, skipped
+
+        # 只收录两个文件中都存在的 key：遍历较小的一方，在较大的一方中查找
+        en_is_smaller = len(en_data) <= len(zh_data)
+        smaller, larger = (en_data, zh_data) if en_is_smaller else (zh_data, en_data)
+        for key, value in smaller.items():
+            other = larger.get(key, _MISSING)
+            if other is _MISSING:
+                continue
+            origin, trans = (value, other) if en_is_smaller else (other, value)
 
-        # 跳过非字符串值（例如 JSON 文本组件）
-        if not isinstance(origin, str) or not isinstance(trans, str):
-            skipped += 1
-            continue
+            # 跳过非字符串值（例如 JSON 文本组件）
+            if type(origin) is not str or type(trans) is not str:
+                skipped += 1
+                continue
 
-        entry = {
-            "origin_name": origin,
-            "trans_name": trans,
-            "modid": modid,
-            "key": key,
-            "version": version,
-            "curseforge": curseforge,
-        }
-        diff_entries.append(entry)
-
-        existing_id = existing_map.get(key)
-        if existing_id:
-            to_update.append((origin, trans, existing_id))
-        else:
-            to_insert.append((origin, trans, modid, key, version, curseforge))
-
-    # 批量操作
-    if to_update:
-        cursor.executemany(
-            "UPDATE dict SET ORIGIN_NAME=?, TRANS_NAME=? WHERE ID=?", to_update
-        )
-    if to_insert:
-        cursor.executemany(
-            "INSERT INTO dict (ORIGIN_NAME, TRANS_NAME, MODID, KEY, VERSION, CURSEFORGE) VALUES (?, ?, ?, ?, ?, ?)",
-            to_insert,
-        )
+            entry = {
+                "origin_name": origin,
+                "trans_name": trans,
+                "modid": modid,
+                "key": key,
+                "version": version,
+                "curseforge": curseforge,
+            }
+            diff_entries.append(entry)
+
+            if key in existing_keys:
+                updated += 1
+            else:
+                new_keys.append(key)
+            yield (origin, trans, modid, key, version, curseforge)
+
+    # 批量写入
+    if use_upsert:
+        cursor.executemany(UPSERT_SQL, iter_rows())
+    else:
+        rows = list(iter_rows())
+        cursor.executemany(UPDATE_SQL, (row for row in rows if row[3] in existing_keys))
+        cursor.executemany(INSERT_SQL, (row for row in rows if row[3] not in existing_keys))
+    # 仅在写入成功后才更新共享的 key 集合，避免失败的模组污染同组后续模组的统计
+    existing_keys.update(new_keys)
 
-    return len(to_insert), len(to_update), skipped, diff_entries
+    return len(diff_entries) - updated, updated, skipped, diff_entries
 
 
 # --- 步骤 4: 重新生成 Release 文件 ---
@@ -264,56 +406,62 @@ def regenerate_release_files(db_path, output_dir):
     print("\n--- 开始从数据库重新生成 Release 文件 ---")
 
     conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
     cursor.execute(
-        "SELECT ORIGIN_NAME, TRANS_NAME, MODID, KEY, VERSION, CURSEFORGE FROM dict"
+        "SELECT ORIGIN_NAME, TRANS_NAME, MODID, KEY, VERSION, CURSEFORGE FROM dict "
+        "WHERE ORIGIN_NAME != '' AND length(ORIGIN_NAME) <= 50"
     )
-    all_entries = [
-        {
-            "origin_name": r["ORIGIN_NAME"],
-            "trans_name": r["TRANS_NAME"],
-            "modid": r["MODID"],
-            "key": r["KEY"],
-            "version": r["VERSION"],
-            "curseforge": r["CURSEFORGE"],
-        }
-        for r in cursor.fetchall()
-    ]
-    conn.close()
 
     integral = []
-    integral_mini_temp = defaultdict(list)
-
-    print(f"处理 {len(all_entries)} 个词条中...")
-    for entry in all_entries:
-        if len(entry["origin_name"]) > 50 or entry["origin_name"] == "":
+    # 一次遍历中直接统计 (原文, 译文) 对的出现次数
+    pair_counts = Counter()
+
+    # 直接流式遍历游标，避免先把整张表物化为列表
+    print("处理词条中...")
+    for origin, trans, modid, key, version, curseforge in cursor:
+        # SQLite 的 length() 遇到 NUL 字符即停止计数，可能低估长度，这里用 Python 长度再检查上限
+        if len(origin) > 50:
             continue
-        integral.append(entry)
-        if entry["origin_name"] != entry["trans_name"]:
-            integral_mini_temp[entry["origin_name"]].append(entry["trans_name"])
-
-    # 使用 Counter 进行高效排序（与上游一致）
-    integral_mini_final = {
-        origin: [item for item, _ in Counter(trans_list).most_common()]
-        for origin, trans_list in integral_mini_temp.items()
-    }
+        integral.append({
+            "origin_name": origin,
+            "trans_name": trans,
+            "modid": modid,
+            "key": key,
+            "version": version,
+            "curseforge": curseforge,
+        })
+        if origin != trans:
+            pair_counts[(origin, trans)] += 1
+    conn.close()
+
+    # 按原文分组；Counter 保持首次出现的顺序，因此分组后的原文与译文顺序均与上游一致
+    grouped = defaultdict(list)
+    for (origin, trans), count in pair_counts.items():
+        grouped[origin].append((count, trans))
+
+    # 按出现次数降序排列译文，次数相同时保持首次出现的顺序（与上游 Counter.most_common() 一致）
+    integral_mini_final = {}
+    for origin, counted in grouped.items():
+        if len(counted) > 1:
+            counted.sort(key=lambda item: item[0], reverse=True)
+        integral_mini_final[origin] = [trans for _, trans in counted]
 
     # 生成 Dict.json
     json_path = output_dir / JSON_FILENAME
-    text = json.dumps(integral, ensure_ascii=False, indent=4)
-    if text != "[]":
-        json_path.write_text(text, encoding="utf-8")
+    if integral:
+        option = orjson.OPT_APPEND_NEWLINE
+        if PRETTY_JSON:
+            option |= orjson.OPT_INDENT_2
+        json_path.write_bytes(orjson.dumps(integral, option=option))
         print(f"已生成 {JSON_FILENAME}，共 {len(integral)} 个词条")
     else:
         print(f"{JSON_FILENAME} 为空，跳过生成。")
 
     # 生成 Dict-Mini.json
     mini_path = output_dir / MINI_JSON_FILENAME
-    mini_text = json.dumps(integral_mini_final, ensure_ascii=False, separators=(",", ":"))
-    if mini_text != "{}":
-        mini_path.write_text(mini_text, encoding="utf-8")
+    if integral_mini_final:
+        mini_path.write_bytes(orjson.dumps(integral_mini_final))
         print(f"已生成 {MINI_JSON_FILENAME}，共 {len(integral_mini_final)} 个词条")
     else:
         print(f"{MINI_JSON_FILENAME} 为空，跳过生成。")
@@ -361,13 +509,11 @@ def main():
     if upstream_tag:
         print(f"上游最新 Release tag: {upstream_tag}")
 
-    if not download_upstream_db(db_asset, db_path):
-        # 无法下载，创建新 DB
-        conn = sqlite3.connect(str(db_path))
-        initialize_db(conn)
-    else:
-        conn = sqlite3.connect(str(db_path))
-        initialize_db(conn)  # 确保索引存在
+    # 无法下载时会创建新 DB；已下载时 initialize_db 用于确保索引存在
+    download_upstream_db(db_asset, db_path)
+    conn = sqlite3.connect(str(db_path), cached_statements=SQLITE_CACHED_STATEMENTS)
+    configure_connection(conn)
+    use_upsert = initialize_db(conn)
 
     cursor = conn.cursor()
 
@@ -377,20 +523,31 @@ def main():
 
     if not mod_entries:
         print("没有找到任何翻译文件，退出。")
-        conn.close()
+        close_connection(conn)
         return
 
     # 3. 逐个合并
     summaries = []
     all_diff_entries = []
     global_patchouli = {}
+    # 所有模组的写入放在同一个显式事务中
+    conn.isolation_level = None
+    cursor.execute("BEGIN")
+
+    groups = {(mod_info["modid"], mod_info["version"], mod_info["curseforge"]) for mod_info in mod_entries}
+    existing_all = load_existing_entries(cursor, groups)
 
-    for mod_info in mod_entries:
+    # 工作线程并行读取 JSON，主线程按顺序串行写入数据库
+    for mod_info, future in iter_loaded_mods(mod_entries):
         label = mod_info["dir_label"]
         print(f"--- 处理: {label} (modid={mod_info['modid']}, version={mod_info['version']}) ---")
 
+        group = (mod_info["modid"], mod_info["version"], mod_info["curseforge"])
+
         try:
-            inserted, updated, skipped, diff_entries = merge_mod_entries(cursor, mod_info, global_patchouli)
+            inserted, updated, skipped, diff_entries = merge_mod_entries(
+                cursor, mod_info, future.result(), global_patchouli, existing_all[group], use_upsert
+            )
             all_diff_entries.extend(diff_entries)
             print(f"  完成: 新增 {inserted} / 更新 {updated} / 跳过 {skipped}")
             summaries.append({
@@ -414,8 +571,8 @@ def main():
                 "error": str(e),
             })
 
-    conn.commit()
-    conn.close()
+    cursor.execute("COMMIT")
+    close_connection(conn)
 
     # 4. 重新生成 Release 文件
     regenerate_release_files(db_path, OUTPUT_DIR)
@@ -423,16 +580,22 @@ def main():
     # 5. 生成 diff.json
     diff_path = OUTPUT_DIR / DIFF_JSON_FILENAME
     print(f"\n正在生成 {DIFF_JSON_FILENAME}，包含 {len(all_diff_entries)} 个变动条目...")
-    with open(diff_path, "w", encoding="utf-8") as f:
-        json.dump(all_diff_entries, f, ensure_ascii=False, indent=4)
+    # 逐条序列化写入（每行一个条目），避免一次性生成整个文件内容
+    with open(diff_path, "wb", buffering=1024 * 1024) as f:
+        f.write(b"[")
+        separator = b"\n"
+        for entry in all_diff_entries:
+            f.write(separator)
+            f.write(orjson.dumps(entry))
+            separator = b",\n"
+        f.write(b"\n]")
     print(f"{DIFF_JSON_FILENAME} 生成完毕。")
 
     # 5.1 生成 patchouli_books.json
     if global_patchouli:
         patchouli_path = OUTPUT_DIR / PATCHOULI_JSON_FILENAME
         print(f"\n正在生成 {PATCHOULI_JSON_FILENAME}，包含 {len(global_patchouli)} 个跨模组翻译条目...")
-        with open(patchouli_path, "w", encoding="utf-8") as f:
-            json.dump(global_patchouli, f, ensure_ascii=False, indent=4)
+        patchouli_path.write_bytes(orjson.dumps(global_patchouli, option=orjson.OPT_INDENT_2))
         print(f"{PATCHOULI_JSON_FILENAME} 生成完毕。")
 
     # 6. 生成 release body